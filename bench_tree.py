@@ -0,0 +1,80 @@
+# bench_tree.py
+"""
+Compares AST rendering latency of the two backends across tree sizes:
+
+- graphviz: utils.build_tree + Digraph.pipe (spawns the `dot` executable)
+- svg:      treelayout.render_svg (pure Python, in-process)
+
+    python bench_tree.py --sizes 10 100 1000 5000 --repeat 5
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import time
+
+from parser import parse
+from treelayout import render_svg
+
+
+def make_ast(statements):
+    """Parses a program of roughly `statements` statements, mixing assignments and if/else."""
+    lines = []
+    for i in range(statements):
+        if i % 5 == 4:
+            lines.append(f"if (v{i - 1} > {i}) {{ v{i - 1} = v{i - 1} * 2; }} else {{ v{i - 1} = {i}; }}")
+        else:
+            lines.append(f"int v{i}; v{i} = v{i} + {i} * 3;")
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parse("\n".join(lines))
+
+
+def count_nodes(node):
+    total = 1
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        for child in current[1:]:
+            total += 1
+            if isinstance(child, tuple):
+                stack.append(child)
+    return total
+
+
+def render_graphviz(ast):
+    from utils import build_tree
+    return build_tree(ast).pipe(format="svg")
+
+
+def best_and_median(func, ast, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(ast)
+        timings.append(time.perf_counter() - start)
+    return min(timings), statistics.median(timings)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="AST renderer benchmark")
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 5000],
+                            help="program sizes in statements")
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    backends = [('svg', render_svg), ('graphviz', render_graphviz)]
+    print(f"{'statements':>10} {'nodes':>8} {'backend':>9} {'best ms':>10} {'median ms':>10}")
+    for size in args.sizes:
+        ast = make_ast(size)
+        nodes = count_nodes(ast)
+        for name, func in backends:
+            try:
+                best, median = best_and_median(func, ast, args.repeat)
+            except Exception as e:
+                print(f"{size:>10} {nodes:>8} {name:>9}   skipped: {type(e).__name__}")
+                continue
+            print(f"{size:>10} {nodes:>8} {name:>9} {best * 1000:>10.2f} {median * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,7 @@ def generate_target(opt_code):
             parts = line.split()
 
             if len(parts) == 5 and parts[1] == '=':
-                # Expression: t1 = a + b
+                # Expression: %t1 = a + b
                 dest, _, op1, operator, op2 = parts
                 target.append(f"MOV R{reg_counter}, {op1}")
                 asm_op = {
@@ -30,13 +30,13 @@ def generate_target(opt_code):
                 target.append(f"MOV {dest}, R{reg_counter}")
 
             elif len(parts) == 3 and parts[1] == '=':
-                # Simple assignment: a = 5 or b = t0
+                # Simple assignment: a = 5 or b = %t0
                 dest, _, src = parts
                 target.append(f"MOV R{reg_counter}, {src}")
                 target.append(f"MOV {dest}, R{reg_counter}")
 
         elif isinstance(line, list):
-            # Handling if-else blocks: if t0 goto T5, etc.
+            # Handling if-else blocks: if %t0 goto T5, etc.
             if line[0] == 'if':
                 target.append(f"if {line[1]} goto T{line[2]}")
             elif line[0] == 'goto':
@@ -4,9 +4,10 @@ temp_counter = 0
 label_counter = 0
 
 def new_temp():
-    """Generates a new temporary variable name (e.g., t0, t1)."""
+    """Generates a new temporary variable name (e.g., %t0, %t1)."""
     global temp_counter
-    temp = f"t{temp_counter}"
+    # '%' cannot start an identifier, so temporaries never clash with user variables
+    temp = f"%t{temp_counter}"
     temp_counter += 1
     return temp
 
@@ -1,4 +1,8 @@
 import ply.lex as lex
+import codecs
+import mmap
+import os
+from array import array
 
 reserved = {
     'int': 'INT',
@@ -55,6 +59,176 @@ def t_error(t):
 
 lexer = lex.lex()
 
+# Small-int code for each token type, used by TokenBuffer
+TOKEN_CODES = {name: code for code, name in enumerate(tokens)}
+
+
+def find_column(text, lexpos):
+    """1-based column of the character at `lexpos` in `text`."""
+    line_start = text.rfind('\n', 0, lexpos) + 1
+    return (lexpos - line_start) + 1
+
+
+class TokenBuffer:
+    """
+    Columnar token storage for large inputs.
+
+    Instead of one (type, value) tuple per token, each column is a flat array:
+    token type codes (see TOKEN_CODES) as bytes, start offsets and line numbers
+    as unsigned ints, and values as indexes into `symbols`, where every distinct
+    lexeme/number is stored once. Indexing still gives (type, value) tuples.
+    """
+
+    def __init__(self, source=None):
+        self.types = array('B')
+        self.offsets = array('I')
+        self.lines = array('I')
+        self.values = array('I')
+        self.symbols = []
+        self._symbol_ids = {}
+        # Offset at which each line starts; line N starts at line_starts[N - 1]
+        self.line_starts = array('I', [0])
+        if source:
+            self.add_lines(source, 0)
+
+    def add_lines(self, text, offset):
+        """Records the line starts in `text`, a piece of the source starting at `offset`."""
+        newline = text.find('\n')
+        while newline != -1:
+            self.line_starts.append(offset + newline + 1)
+            newline = text.find('\n', newline + 1)
+
+    def append(self, type, value, offset, line):
+        symbol = self._symbol_ids.get(value)
+        if symbol is None:
+            symbol = self._symbol_ids[value] = len(self.symbols)
+            self.symbols.append(value)
+        self.types.append(TOKEN_CODES[type])
+        self.offsets.append(offset)
+        self.lines.append(line)
+        self.values.append(symbol)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        return tokens[self.types[index]], self.symbols[self.values[index]]
+
+    def __iter__(self):
+        symbols = self.symbols
+        for code, symbol in zip(self.types, self.values):
+            yield tokens[code], symbols[symbol]
+
+    def indexes_of(self, type):
+        """Indexes of all tokens of the given type, in source order."""
+        code = TOKEN_CODES[type]
+        return [i for i, t in enumerate(self.types) if t == code]
+
+    def position(self, index):
+        """(line, column) of a token, both 1-based."""
+        line = self.lines[index]
+        return line, self.offsets[index] - self.line_starts[line - 1] + 1
+
+    @property
+    def nbytes(self):
+        """Memory used by the token columns (excluding the symbol table)."""
+        return sum(column.itemsize * len(column)
+                   for column in (self.types, self.offsets, self.lines, self.values))
+
+
 def tokenize(code):
     lexer.input(code)
+    lexer.lineno = 1
     return [(tok.type, tok.value) for tok in lexer]
+
+
+def tokenize_buffer(code):
+    """Like tokenize, but returns a TokenBuffer that also records source positions."""
+    buffer = TokenBuffer(code)
+    lexer.input(code)
+    lexer.lineno = 1
+    for tok in lexer:
+        buffer.append(tok.type, tok.value, tok.lexpos, tok.lineno)
+    return buffer
+
+
+# Bytes mapped and decoded at a time by tokenize_file
+CHUNK_SIZE = 1 << 20
+
+# Characters a piece may end with: no token continues past any of them
+CUT_AFTER = ' \t\n;{}()'
+
+# Longest stretch without a cut point that read_chunks will hold back
+MAX_TOKEN = 1 << 16
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE, max_token=MAX_TOKEN):
+    """
+    Yields (text, offset) pieces of a UTF-8 source file, memory-mapped and
+    decoded `chunk_size` bytes at a time. Pieces are only cut right after one
+    of CUT_AFTER, so no token is ever split between two pieces. `offset` is
+    the character offset of the piece in the whole file. Raises ValueError if
+    more than `max_token` characters go by without a cut point.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return  # empty files cannot be mapped
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            carry = ''
+            offset = 0
+            released = 0
+            for start in range(0, len(data), chunk_size):
+                final = start + chunk_size >= len(data)
+                text = carry + decoder.decode(data[start:start + chunk_size], final)
+                # The bytes are copied into `text`, so the pages read so far can be
+                # dropped from memory (madvise needs page aligned ranges)
+                done = min(start + chunk_size, len(data))
+                done -= done % mmap.PAGESIZE
+                if hasattr(mmap, 'MADV_DONTNEED') and done > released:
+                    data.madvise(mmap.MADV_DONTNEED, released, done - released)
+                    released = done
+                cut = len(text) if final else max(text.rfind(c) for c in CUT_AFTER) + 1
+                # cut == 0: no cut point yet, keep the whole text for the next chunk
+                if cut:
+                    yield text[:cut], offset
+                    offset += cut
+                carry = text[cut:]
+                if len(carry) > max_token:
+                    raise ValueError(f"{path}: no whitespace or punctuation in "
+                                     f"{len(carry)} characters at offset {offset}")
+
+
+def lex_pieces(pieces):
+    """Lexes consecutive (text, offset) pieces of one source as a single token stream."""
+    # A private copy, so the shared lexer used by tokenize/parse is not disturbed
+    chunk_lexer = lexer.clone()
+    chunk_lexer.lineno = 1
+    for text, offset in pieces:
+        chunk_lexer.input(text)
+        for tok in chunk_lexer:
+            tok.lexpos += offset
+            yield tok
+
+
+def tokenize_file(path, chunk_size=CHUNK_SIZE):
+    """
+    Lexes a source file incrementally, yielding tokens (with `lineno` and
+    file-wide `lexpos`) as they are found. Memory use stays flat no matter how
+    large the file is.
+    """
+    return lex_pieces(read_chunks(path, chunk_size))
+
+
+def tokenize_file_buffer(path, chunk_size=CHUNK_SIZE):
+    """Lexes a source file chunk by chunk straight into a TokenBuffer."""
+    buffer = TokenBuffer()
+
+    def pieces():
+        for text, offset in read_chunks(path, chunk_size):
+            buffer.add_lines(text, offset)
+            yield text, offset
+
+    for tok in lex_pieces(pieces()):
+        buffer.append(tok.type, tok.value, tok.lexpos, tok.lineno)
+    return buffer
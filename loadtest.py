@@ -0,0 +1,130 @@
+# loadtest.py
+"""
+Load generator for the compile service in server.py.
+
+Opens `--concurrency` keep-alive connections to the server and sends
+`--requests` compile requests in total, then reports throughput, latency
+percentiles and the status codes seen. With `--spawn` it starts a server on
+localhost first and stops it afterwards.
+
+    python loadtest.py --spawn --concurrency 32 --requests 5000
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from collections import Counter
+
+SAMPLE_CODE = "int x;\nint y;\nif (x > 0) {\n    y = x * 2;\n} else {\n    y = 0;\n}"
+
+
+async def send(reader, writer, host, body):
+    """Sends one POST /compile on an open connection and returns the status code."""
+    writer.write(
+        f"POST /compile HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body
+    )
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode('latin-1').split("\r\n")
+    status = int(lines[0].split()[1])
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host, port, body, count, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            status = await send(reader, writer, host, body)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def run(host, port, concurrency, total, body):
+    latencies = []
+    statuses = Counter()
+    # Spread the requests over the clients as evenly as possible
+    counts = [total // concurrency + (i < total % concurrency) for i in range(concurrency)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, body, n, latencies, statuses) for n in counts if n))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"Requests:    {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:.1f} req/s)")
+    print(f"Concurrency: {concurrency}")
+    print("Latency:     p50 {:.2f}ms  p90 {:.2f}ms  p99 {:.2f}ms  max {:.2f}ms".format(
+        *(percentile(latencies, f) * 1000 for f in (0.5, 0.9, 0.99, 1.0))))
+    print("Statuses:    " + ", ".join(f"{code}: {n}" for code, n in sorted(statuses.items())))
+
+
+async def wait_for_server(host, port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Load test for the compile service")
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8000)
+    arg_parser.add_argument('--concurrency', type=int, default=16)
+    arg_parser.add_argument('--requests', type=int, default=2000)
+    arg_parser.add_argument('--phases', default='tokens,ast,semantic,intermediate,optimized,target',
+                            help="comma separated phases to request")
+    arg_parser.add_argument('--file', help="source file to compile (default: built-in sample)")
+    arg_parser.add_argument('--spawn', action='store_true',
+                            help="start server.py on localhost for the duration of the test")
+    arg_parser.add_argument('--workers', type=int, default=None,
+                            help="worker processes for the spawned server")
+    args = arg_parser.parse_args()
+
+    code = SAMPLE_CODE
+    if args.file:
+        with open(args.file) as f:
+            code = f.read()
+    body = json.dumps({'code': code, 'phases': args.phases.split(',')}).encode('utf-8')
+
+    server = None
+    if args.spawn:
+        command = [sys.executable, 'server.py', '--host', args.host, '--port', str(args.port)]
+        if args.workers:
+            command += ['--workers', str(args.workers)]
+        server = subprocess.Popen(command)
+    try:
+        if server:
+            asyncio.run(wait_for_server(args.host, args.port))
+        asyncio.run(run(args.host, args.port, args.concurrency, args.requests, body))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,6 @@
 import streamlit as st
-from lexer import tokenize
-from parser import parse
-from semantic import semantic_check
-from intermediate import generate_code
-from optimizer import optimize
-from codegen import generate_target
-from utils import build_tree
-from PIL import Image
-import os
-import tempfile
+from pipeline import Compilation
+from optimizer import DEFAULT_LEVEL, OPT_LEVELS
 
 # Configure page
 st.set_page_config(
@@ -89,18 +81,21 @@ def display_output(title, content, color_class="code-output"):
     
     st.code(content_str, language="text")
 
-def visualize_compiler_phases(code):
+def visualize_compiler_phases(code, opt_level=DEFAULT_LEVEL, tree_renderer="Graphviz"):
     """Main function to process code through all compiler phases"""
     
     # Initialize session state for results
     if 'results' not in st.session_state:
         st.session_state.results = {}
     
+    # Each phase below is computed on first access
+    compilation = Compilation(code, opt_level)
+    
     try:
         # Phase 1: Lexical Analysis
         st.markdown('<div class="phase-header">🔤 Lexical Analysis (Tokenization)</div>', unsafe_allow_html=True)
         with st.spinner("Tokenizing input..."):
-            tokens = tokenize(code)
+            tokens = compilation.tokens
             st.session_state.results['tokens'] = tokens
             
             if tokens:
@@ -112,7 +107,7 @@ def visualize_compiler_phases(code):
         # Phase 2: Parsing
         st.markdown('<div class="phase-header">🌳 Syntax Analysis (Parsing)</div>', unsafe_allow_html=True)
         with st.spinner("Parsing tokens..."):
-            ast = parse(code)
+            ast = compilation.ast
             
             if ast is None:
                 st.error("❌ Syntax Error: Could not parse the input code")
@@ -124,23 +119,15 @@ def visualize_compiler_phases(code):
             
             # Generate and display parse tree visualization
             try:
-                tree = build_tree(ast)
+                if tree_renderer == "Built-in (SVG)":
+                    image = compilation.tree_svg
+                else:
+                    image = compilation.tree_image
                 
-                # Use temporary directory for file operations
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    tree_path = os.path.join(temp_dir, "ast")
-                    tree.render(tree_path, format="png", cleanup=True)
-                    
-                    image_path = tree_path + ".png"
-                    if os.path.exists(image_path):
-                        image = Image.open(image_path)
-                        
-                        # Create columns for centering the image
-                        col1, col2, col3 = st.columns([1, 2, 1])
-                        with col2:
-                            st.image(image, caption="Abstract Syntax Tree", use_container_width=True)
-                    else:
-                        st.warning("⚠️ Could not generate tree visualization")
+                # Create columns for centering the image
+                col1, col2, col3 = st.columns([1, 2, 1])
+                with col2:
+                    st.image(image, caption="Abstract Syntax Tree", use_container_width=True)
                         
             except Exception as e:
                 st.warning(f"⚠️ Tree visualization failed: {str(e)}")
@@ -148,7 +135,7 @@ def visualize_compiler_phases(code):
         # Phase 3: Semantic Analysis
         st.markdown('<div class="phase-header">🔍 Semantic Analysis</div>', unsafe_allow_html=True)
         with st.spinner("Performing semantic analysis..."):
-            sem_errors = semantic_check(ast)
+            sem_errors = compilation.errors
             st.session_state.results['semantic'] = sem_errors
             
             if sem_errors:
@@ -160,19 +147,25 @@ def visualize_compiler_phases(code):
         # Phase 4: Intermediate Code Generation
         st.markdown('<div class="phase-header">⚙️ Intermediate Code Generation</div>', unsafe_allow_html=True)
         with st.spinner("Generating intermediate code..."):
-            ic = generate_code(ast)
+            ic = compilation.ir
             st.session_state.results['intermediate'] = ic
             
             if ic:
                 st.code("\n".join(str(line) for line in ic), language="text")
                 st.success(f"✅ Generated {len(ic)} lines of intermediate code")
+
+                with st.expander("SSA form"):
+                    try:
+                        st.code("\n".join(compilation.ssa), language="text")
+                    except Exception as e:
+                        st.warning(f"⚠️ SSA form failed: {str(e)}")
             else:
                 st.warning("⚠️ No intermediate code generated")
         
         # Phase 5: Code Optimization
         st.markdown('<div class="phase-header">🚀 Code Optimization</div>', unsafe_allow_html=True)
         with st.spinner("Optimizing code..."):
-            opt = optimize(ic)
+            opt = compilation.optimized
             st.session_state.results['optimized'] = opt
             
             if opt:
@@ -187,13 +180,17 @@ def visualize_compiler_phases(code):
                     st.info(f"ℹ️ No optimizations applied ({optimized_lines} lines)")
                 else:
                     st.info(f"ℹ️ Code expanded to {optimized_lines} lines after optimization")
+                
+                # Per-pass cost and effect
+                if compilation.pass_stats:
+                    st.table([stats.as_dict() for stats in compilation.pass_stats])
             else:
                 st.warning("⚠️ No optimized code generated")
         
         # Phase 6: Target Code Generation
         st.markdown('<div class="phase-header">💻 Target Code Generation</div>', unsafe_allow_html=True)
         with st.spinner("Generating target code..."):
-            target = generate_target(opt)
+            target = compilation.target
             st.session_state.results['target'] = target
             
             if target:
@@ -229,6 +226,17 @@ def main():
         st.markdown("## ⚙️ Options")
         show_debug = st.checkbox("Show debug information", value=False)
         auto_run = st.checkbox("Auto-run on code change", value=False)
+        opt_level = st.selectbox(
+            "Optimization level:",
+            list(OPT_LEVELS),
+            index=list(OPT_LEVELS).index(DEFAULT_LEVEL),
+            format_func=lambda level: f"-O{level}"
+        )
+        tree_renderer = st.radio(
+            "AST renderer:",
+            ["Graphviz", "Built-in (SVG)"],
+            help="The built-in renderer lays the tree out in Python and needs no Graphviz install"
+        )
     
     # Main content area
     col1, col2 = st.columns([1, 2])
@@ -270,7 +278,7 @@ def main():
         st.markdown("### 📊 Compilation Results")
         
         if run_compiler and input_code.strip():
-            visualize_compiler_phases(input_code)
+            visualize_compiler_phases(input_code, opt_level, tree_renderer)
         elif run_compiler and not input_code.strip():
             st.warning("⚠️ Please enter some source code to compile")
         else:
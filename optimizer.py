@@ -1,77 +1,217 @@
 # optimizer.py
+import time
 
-def optimize(inter_code):
+from ssa import sccp
+
+# Pass name -> pass class, filled in by @register
+PASSES = {}
+
+# Optimization level -> names of the passes to run, in order
+OPT_LEVELS = {
+    0: [],
+    1: ['constant-folding'],
+    2: ['sccp', 'constant-folding', 'copy-propagation'],
+}
+DEFAULT_LEVEL = 2
+
+# How many times the pass pipeline may be repeated while it still changes the code
+DEFAULT_MAX_ITERATIONS = 4
+
+
+def register(pass_class):
+    """Class decorator that makes a pass available to OPT_LEVELS by its name."""
+    PASSES[pass_class.name] = pass_class
+    return pass_class
+
+
+class Pass:
+    """An optimization pass: takes a list of intermediate code lines and returns a new list."""
+    name = None
+
+    def run(self, inter_code):
+        raise NotImplementedError
+
+
+@register
+class ConstantFolding(Pass):
+    """Solves constant expressions (e.g., 5 * 2 -> 10)."""
+    name = 'constant-folding'
+
+    def run(self, inter_code):
+        folded_code = []
+        for line in inter_code:
+            if isinstance(line, str) and len(line.split()) == 5:
+                parts = line.split()
+                # Check for assignment of a binary operation
+                if parts[1] == '=' and parts[2].isdigit() and parts[4].isdigit():
+                    try:
+                        # Perform the operation
+                        result = eval(f"{parts[2]} {parts[3]} {parts[4]}")
+                        folded_code.append(f"{parts[0]} = {result}")
+                        # print(f"Folded: {line} -> {parts[0]} = {result}") # Debug print
+                        continue # Skip appending the original line
+                    except:
+                        pass # Ignore errors from eval like division by zero
+            folded_code.append(line)
+        return folded_code
+
+
+@register
+class CopyPropagation(Pass):
     """
-    Performs multiple optimization passes:
-    1. Constant Folding: Solves constant expressions (e.g., 5 * 2 -> 10).
-    2. Copy Propagation & Dead Code Elimination: Replaces variables that just copy others
-       and removes the now-unnecessary copy statements.
+    Copy Propagation & Dead Code Elimination: Replaces temporaries that just copy
+    another temporary or a constant (e.g., %t1 = %t0, %t2 = 10) and removes the
+    now-unnecessary copy statements.
+
+    A copy cycle has no source to propagate, so it is left alone:
+
+    >>> CopyPropagation().run(['%t0 = %t0', 'x = %t0'])
+    ['%t0 = %t0', 'x = %t0']
+    >>> CopyPropagation().run(['%t0 = 5', '%t1 = %t0', 'x = %t1'])
+    ['x = 5']
     """
-    
-    # --- Pass 1: Constant Folding ---
-    folded_code = []
-    for line in inter_code:
-        if isinstance(line, str) and len(line.split()) == 5:
-            parts = line.split()
-            # Check for assignment of a binary operation
-            if parts[1] == '=' and parts[2].isdigit() and parts[4].isdigit():
-                try:
-                    # Perform the operation
-                    result = eval(f"{parts[2]} {parts[3]} {parts[4]}")
-                    folded_code.append(f"{parts[0]} = {result}")
-                    # print(f"Folded: {line} -> {parts[0]} = {result}") # Debug print
-                    continue # Skip appending the original line
-                except:
-                    pass # Ignore errors from eval like division by zero
-        folded_code.append(line)
-
-    # --- Pass 2: Copy Propagation and Dead Code Elimination ---
-    
-    # Find all direct copies (e.g., t1 = t0)
-    copies = {}
-    for line in folded_code:
-        if isinstance(line, str) and len(line.split()) == 3:
-            dest, op, src = line.split()
-            if op == '=' and (src.startswith('t') or dest.startswith('t')):
+    name = 'copy-propagation'
+
+    def run(self, inter_code):
+        # Find all direct copies into temporaries. Temporaries are assigned only
+        # once, so substituting them everywhere is always safe.
+        copies = {}
+        for line in inter_code:
+            if isinstance(line, str) and len(line.split()) == 3:
+                dest, op, src = line.split()
+                if op == '=' and is_temp(dest) and (is_temp(src) or is_number(src)):
+                    copies[dest] = src
+
+        # Follow chains like %t2 = %t1, %t1 = 5 down to the final source
+        cyclic = set()
+        for dest, src in copies.items():
+            seen = {dest}
+            while src in copies and src not in seen:
+                seen.add(src)
+                src = copies[src]
+            if src in seen:
+                cyclic.add(dest)  # e.g. %t0 = %t0
+            else:
                 copies[dest] = src
-    
-    # Propagate (substitute) the copies
-    propagated_code = []
-    for line in folded_code:
-        # Don't propagate into the original copy statements themselves
-        is_original_copy = False
-        if isinstance(line, str) and len(line.split()) == 3:
-             dest, _, _ = line.split()
-             if dest in copies:
-                 is_original_copy = True
-
-        if not is_original_copy:
-            new_line = line
-            for dest, src in copies.items():
-                # Replace whole words only to avoid replacing 't1' in 't10'
-                new_line = new_line.replace(f" {dest}", f" {src}").replace(f"({dest}", f"({src}")
-            propagated_code.append(new_line)
-        else:
-            # We keep the original copy for now, but will remove it later if unused
-            propagated_code.append(line)
-
-    # Determine which copy variables are actually used
-    used_vars = set()
-    for line in propagated_code:
-        parts = line.split()
-        if len(parts) >= 3:
-            # Add RHS variables for lines like "t2 = t0 + t1" or "if_false t0 goto L1"
-            used_vars.update(part for part in parts[1:] if part in copies)
-        
-    # Final pass: Remove dead code (unused copy statements)
-    optimized_code = []
-    for line in propagated_code:
-        if isinstance(line, str) and len(line.split()) == 3:
-            dest, op, src = line.split()
-            # If it's a copy statement and its destination is never used, it's dead code
-            if op == '=' and dest in copies and dest not in used_vars:
-                # print(f"Eliminated Dead Code: {line}") # Debug print
-                continue # Skip this line
-        optimized_code.append(line)
-        
-    return optimized_code
\ No newline at end of file
+        for dest in cyclic:
+            del copies[dest]
+
+        optimized_code = []
+        for line in inter_code:
+            if not isinstance(line, str):
+                optimized_code.append(line)
+                continue
+            parts = line.split()
+            if len(parts) == 3 and parts[1] == '=' and parts[0] in copies:
+                # Every use gets substituted below, so the copy itself is dead code
+                continue
+            # Replace whole tokens only, and never the variable being assigned
+            first = 2 if len(parts) > 1 and parts[1] == '=' else 0
+            if any(part in copies for part in parts[first:]):
+                parts = parts[:first] + [copies.get(part, part) for part in parts[first:]]
+                line = " ".join(parts)
+            optimized_code.append(line)
+
+        return optimized_code
+
+
+def is_temp(name):
+    """True for temporaries created by intermediate.new_temp (%t0, %t1, ...)."""
+    return name[:2] == '%t' and name[2:].isdigit()
+
+
+def is_number(value):
+    return value.lstrip('-').isdigit()
+
+
+@register
+class SparseConditionalConstantPropagation(Pass):
+    """
+    Builds SSA form, propagates constants along the branches that can actually
+    be taken and removes the others (see ssa.py), then leaves SSA form again.
+    """
+    name = 'sccp'
+
+    def run(self, inter_code):
+        return sccp(inter_code)
+
+
+class PassStats:
+    """Accumulated cost and effect of one pass across all iterations."""
+
+    def __init__(self, name):
+        self.name = name
+        self.runs = 0
+        self.seconds = 0.0
+        self.removed = 0  # net number of lines removed
+
+    def as_dict(self):
+        return {'pass': self.name, 'runs': self.runs,
+                'time_ms': round(self.seconds * 1000, 3), 'removed': self.removed}
+
+
+class PassManager:
+    """
+    Runs a pipeline of passes over the intermediate code, repeating it until no
+    pass changes the code any more (a fixpoint) or `max_iterations` is reached.
+    Per-pass statistics are collected in `stats`.
+    """
+
+    def __init__(self, passes, max_iterations=DEFAULT_MAX_ITERATIONS):
+        self.passes = list(passes)
+        self.max_iterations = max_iterations
+        self.stats = [PassStats(p.name) for p in self.passes]
+        self.iterations = 0
+
+    def run(self, inter_code):
+        code = list(inter_code)
+        while self.iterations < self.max_iterations:
+            self.iterations += 1
+            changed = False
+            for opt_pass, stats in zip(self.passes, self.stats):
+                start = time.perf_counter()
+                new_code = opt_pass.run(code)
+                stats.seconds += time.perf_counter() - start
+                stats.runs += 1
+                stats.removed += len(code) - len(new_code)
+                if new_code != code:
+                    changed = True
+                code = new_code
+            if not changed:
+                break
+        return code
+
+    def report(self):
+        """Human readable per-pass summary lines."""
+        lines = [f"{s.name}: {s.runs} run(s), {s.seconds * 1000:.3f} ms, {s.removed} line(s) removed"
+                 for s in self.stats]
+        lines.append(f"{self.iterations} iteration(s)")
+        return lines
+
+
+def parse_level(level):
+    """Accepts 2, '2' or '-O2' and returns the level as an int."""
+    if isinstance(level, str):
+        level = level.strip()
+        if level.startswith('-O'):
+            level = level[2:]
+        level = int(level)
+    if level not in OPT_LEVELS:
+        raise ValueError(f"Unknown optimization level -O{level}")
+    return level
+
+
+def pass_manager(level=DEFAULT_LEVEL, max_iterations=DEFAULT_MAX_ITERATIONS):
+    """Builds the PassManager for an optimization level (-O0 .. -O2)."""
+    names = OPT_LEVELS[parse_level(level)]
+    return PassManager([PASSES[name]() for name in names], max_iterations)
+
+
+def optimize(inter_code, level=DEFAULT_LEVEL):
+    """
+    Optimizes intermediate code at the given level:
+    -O0 does nothing, -O1 folds constants, -O2 also propagates constants
+    through branches (removing the ones that are never taken), propagates
+    copies and removes the dead copy statements, repeating until nothing changes.
+    """
+    return pass_manager(level).run(inter_code)
@@ -1,8 +1,20 @@
 import ply.yacc as yacc
-from lexer import tokens
+from lexer import tokens, lexer, find_column
 
 start = 'statements'
 
+
+class Node(tuple):
+    """An AST node tuple that also remembers the (line, column) of its identifier."""
+    position = None
+
+
+def located(p, n, *fields):
+    """Builds a Node whose position is that of the n-th symbol of production p."""
+    node = Node(fields)
+    node.position = (p.lineno(n), find_column(p.lexer.lexdata, p.lexpos(n)))
+    return node
+
 def p_statements_multiple(p):
     'statements : statements statement'
     p[0] = p[1] + [p[2]]
@@ -13,11 +25,11 @@ def p_statements_single(p):
 
 def p_statement_declare(p):
     'statement : INT ID SEMICOLON'
-    p[0] = ('declare', p[2])
+    p[0] = located(p, 2, 'declare', p[2])
 
 def p_statement_assign(p):
     'statement : ID EQUALS expression SEMICOLON'
-    p[0] = ('assign', p[1], p[3])
+    p[0] = located(p, 1, 'assign', p[1], p[3])
 
 def p_expression_binop(p):
     '''expression : expression PLUS term
@@ -43,11 +55,12 @@ def p_factor_num(p):
 
 def p_factor_id(p):
     'factor : ID'
-    p[0] = ('id', p[1])
+    p[0] = located(p, 1, 'id', p[1])
 
 def p_error(p):
     if p:
-        print(f"Syntax error at token '{p.value}', line {p.lineno}")
+        column = find_column(p.lexer.lexdata, p.lexpos)
+        print(f"Syntax error at token '{p.value}', line {p.lineno}, column {column}")
     else:
         print("Syntax error at EOF")
 
@@ -91,4 +104,5 @@ def p_statements_single(p):
 parser = yacc.yacc()
 
 def parse(code):
-    return parser.parse(code)
+    lexer.lineno = 1
+    return parser.parse(code, lexer=lexer)
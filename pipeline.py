@@ -0,0 +1,142 @@
+# pipeline.py
+"""
+Lazy, demand-driven compilation pipeline.
+
+A `Compilation` wraps one source string. Each phase result is an attribute
+that is computed the first time it is read and then memoized, after first
+computing the phases it declares as dependencies:
+
+    token_buffer                (source) columnar tokens with positions
+    tokens      <- token_buffer list of (type, value) tokens
+    ast                         (source)
+    errors      <- ast          semantic errors with line/column
+    ir          <- ast          intermediate (three-address) code
+    ssa         <- ir           SSA form listing of the intermediate code
+    optimization <- ir          (optimized code, per-pass statistics)
+    optimized   <- optimization
+    pass_stats  <- optimization
+    target      <- optimized
+    tree_image  <- ast          PNG bytes of the AST drawing (Graphviz)
+    tree_svg    <- ast          SVG text of the AST drawing (pure Python)
+
+So reading `compilation.ast` never tokenizes separately, and reading
+`compilation.tokens` never parses. If parsing fails `ast` is None, and so is
+every phase that depends on it.
+"""
+import time
+
+from lexer import tokenize_buffer
+from parser import parse
+from semantic import semantic_check
+from intermediate import generate_code
+from optimizer import DEFAULT_LEVEL, pass_manager
+from codegen import generate_target
+from ssa import build_ssa, format_ssa
+from treelayout import render_svg
+
+# Phase name -> names of the phases it depends on, filled in by @phase
+PHASES = {}
+
+
+def phase(*depends):
+    """Declares a memoized phase computed from the results of `depends`."""
+    def decorator(func):
+        name = func.__name__
+        PHASES[name] = depends
+
+        def getter(self):
+            if name not in self._results:
+                args = [getattr(self, dep) for dep in depends]
+                if any(arg is None for arg in args):
+                    # A dependency failed (e.g. syntax error), nothing to build on
+                    self._results[name] = None
+                else:
+                    start = time.perf_counter()
+                    self._results[name] = func(self, *args)
+                    self.timings[name] = time.perf_counter() - start
+            return self._results[name]
+
+        return property(getter, doc=func.__doc__)
+    return decorator
+
+
+class Compilation:
+    """One source string and the lazily computed results of each compiler phase."""
+
+    def __init__(self, code, opt_level=DEFAULT_LEVEL):
+        self.code = code
+        self.opt_level = opt_level
+        self._results = {}
+        self.timings = {}  # phase name -> seconds spent computing it
+
+    def computed(self, name):
+        """True if the phase has already been computed."""
+        return name in self._results
+
+    def results(self, names):
+        """Returns {name: result} for the given phases, computing only what they need."""
+        return {name: getattr(self, name) for name in names}
+
+    @phase()
+    def token_buffer(self):
+        """lexer.TokenBuffer with source positions."""
+        return tokenize_buffer(self.code)
+
+    @phase('token_buffer')
+    def tokens(self, token_buffer):
+        """List of (type, value) tokens."""
+        return list(token_buffer)
+
+    @phase()
+    def ast(self):
+        """List of statement nodes, or None on a syntax error."""
+        return parse(self.code)
+
+    @phase('ast')
+    def errors(self, ast):
+        """Semantic error messages."""
+        return semantic_check(ast)
+
+    @phase('ast')
+    def ir(self, ast):
+        """Intermediate three-address code."""
+        return generate_code(ast)
+
+    @phase('ir')
+    def ssa(self, ir):
+        """Intermediate code in SSA form, as printable lines."""
+        ssa = build_ssa(ir)
+        return format_ssa(ssa) if ssa is not None else []
+
+    @phase('ir')
+    def optimization(self, ir):
+        """(optimized code, list of optimizer.PassStats) at `opt_level`."""
+        manager = pass_manager(self.opt_level)
+        return manager.run(ir), manager.stats
+
+    @phase('optimization')
+    def optimized(self, optimization):
+        """Optimized intermediate code."""
+        return optimization[0]
+
+    @phase('optimization')
+    def pass_stats(self, optimization):
+        """Time spent and lines removed by each optimization pass."""
+        return optimization[1]
+
+    @phase('optimized')
+    def target(self, optimized):
+        """Target assembly lines."""
+        return generate_target(optimized)
+
+    @phase('ast')
+    def tree_image(self, ast):
+        """PNG rendering of the AST (requires Graphviz)."""
+        # Imported here so the other phases work without Graphviz installed
+        from utils import build_tree
+        return build_tree(ast).pipe(format="png")
+
+    @phase('ast')
+    def tree_svg(self, ast):
+        """SVG rendering of the AST, laid out in-process (no Graphviz needed)."""
+        return render_svg(ast)
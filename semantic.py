@@ -1,4 +1,8 @@
 def semantic_check(ast_list):
+    """
+    Checks declarations and uses of variables. Each error reports the line and
+    column of the identifier, as recorded by the parser (parser.Node.position).
+    """
     errors = []
     declared_vars = set()
 
@@ -6,13 +10,13 @@ def semantic_check(ast_list):
         if stmt[0] == 'declare':
             var_name = stmt[1]
             if var_name in declared_vars:
-                errors.append(f"Semantic Error: Variable '{var_name}' already declared.")
+                errors.append(f"Semantic Error: Variable '{var_name}' already declared{locate(stmt)}.")
             else:
                 declared_vars.add(var_name)
         elif stmt[0] == 'assign':
             var_name = stmt[1]
             if var_name not in declared_vars:
-                errors.append(f"Semantic Error: Variable '{var_name}' used before declaration.")
+                errors.append(f"Semantic Error: Variable '{var_name}' used before declaration{locate(stmt)}.")
             check_expr(stmt[2], declared_vars, errors)
 
         elif stmt[0] == 'ifelse':
@@ -28,7 +32,16 @@ def check_expr(expr, declared_vars, errors):
     if isinstance(expr, tuple):
         if expr[0] == 'id':
             if expr[1] not in declared_vars:
-                errors.append(f"Semantic Error: Variable '{expr[1]}' used before declaration.")
+                errors.append(f"Semantic Error: Variable '{expr[1]}' used before declaration{locate(expr)}.")
         elif expr[0] in ('+', '-', '*', '/'):
             check_expr(expr[1], declared_vars, errors)
             check_expr(expr[2], declared_vars, errors)
+
+
+def locate(node):
+    """Formats the source position of a node's identifier for a message."""
+    position = getattr(node, 'position', None)
+    if position is None:
+        return ""
+    line, column = position
+    return f" (line {line}, column {column})"
@@ -0,0 +1,380 @@
+# server.py
+"""
+Local HTTP/JSON compile service.
+
+Runs the compiler phases behind a small asyncio HTTP server so other tools can
+use the compiler without Streamlit. Requests are queued, grouped into small
+batches and handed to a pool of worker processes that load the parser tables
+once at start-up.
+
+    POST /compile   {"code": "int x;", "phases": ["tokens", "ast"], "opt_level": 2}
+    GET  /health
+
+Start it with:  python server.py --port 8000 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from optimizer import DEFAULT_LEVEL, OPT_LEVELS
+from pipeline import Compilation
+
+# Phases that can be requested, in pipeline order
+PHASES = ['tokens', 'ast', 'semantic', 'intermediate', 'optimized', 'pass_stats', 'target']
+
+# Request phase name -> Compilation attribute
+PHASE_ATTRS = {
+    'tokens': 'tokens',
+    'ast': 'ast',
+    'semantic': 'errors',
+    'intermediate': 'ir',
+    'optimized': 'optimized',
+    'pass_stats': 'pass_stats',
+    'target': 'target',
+}
+
+STATUS_TEXT = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable',
+    504: 'Gateway Timeout',
+}
+
+
+# --- Worker side -------------------------------------------------------------
+
+def warm_worker(pids):
+    """Process initializer: reports the worker's pid and builds the lexer and parser tables."""
+    pids.put(os.getpid())
+    Compilation("int x;").ast
+
+
+def compile_source(code, phases, opt_level=DEFAULT_LEVEL):
+    """Runs only the phases needed to produce `phases` and returns their results."""
+    compilation = Compilation(code, opt_level)
+    results = {}
+    for name in PHASES:
+        if name not in phases:
+            continue
+        result = getattr(compilation, PHASE_ATTRS[name])
+        if result is None and compilation.ast is None:
+            results['error'] = "Syntax Error: Could not parse the input code"
+            break
+        if name == 'pass_stats':
+            result = [stats.as_dict() for stats in result]
+        results[name] = result
+    return results
+
+
+def compile_batch(batch):
+    """Compiles a list of (code, phases, opt_level) jobs; a failure only affects its own entry."""
+    results = []
+    for code, phases, opt_level in batch:
+        try:
+            results.append(compile_source(code, phases, opt_level))
+        except Exception as e:
+            results.append({'error': f"An error occurred during compilation: {e}"})
+    return results
+
+
+# --- Server side -------------------------------------------------------------
+
+class Overloaded(Exception):
+    """Raised when the pending queue is full."""
+
+
+class JobTimeout(Exception):
+    """Raised when a batch does not finish within the job timeout."""
+
+
+class CompileService:
+    """Queues compile requests and dispatches them to the worker pool in batches."""
+
+    def __init__(self, workers=None, batch_size=16, batch_window=0.002, max_pending=256,
+                 job_timeout=10.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.job_timeout = job_timeout
+        self.pool, self.pids = self._new_pool()
+        self.timeouts = 0
+        self.restarts = 0
+        self.queue = asyncio.Queue(maxsize=max_pending)
+        # One in-flight batch per worker; further requests wait in the queue
+        self.slots = asyncio.Semaphore(self.workers)
+        self.tasks = set()
+        self.dispatcher = None
+
+    def _new_pool(self):
+        """Returns a new pool and the queue its workers report their pids on."""
+        pids = multiprocessing.SimpleQueue()
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_worker,
+                                   initargs=(pids,))
+        # Submitting no-op jobs makes the pool spawn (and warm) every worker now
+        for _ in range(self.workers):
+            pool.submit(int)
+        return pool, pids
+
+    def _replace_pool(self, stuck):
+        """Swaps in a fresh pool and kills the workers of `stuck`, which has a hung job."""
+        if stuck is not self.pool:
+            return  # already replaced because of another batch
+        pids = self.pids
+        self.pool, self.pids = self._new_pool()
+        self.restarts += 1
+        # A running job cannot be cancelled, so the only way out is to kill its process.
+        # SIGKILL, because forked workers inherit the server's SIGTERM handler.
+        while not pids.empty():
+            try:
+                os.kill(pids.get(), signal.SIGKILL)
+            except ProcessLookupError:
+                pass  # already gone
+        stuck.shutdown(wait=False, cancel_futures=True)
+
+    def start(self):
+        self.dispatcher = asyncio.create_task(self._dispatch())
+
+    async def close(self):
+        if self.dispatcher:
+            self.dispatcher.cancel()
+        # Let in-flight batches finish; a hung one is killed after job_timeout
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+    async def submit(self, code, phases, opt_level=DEFAULT_LEVEL):
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait(((code, phases, opt_level), future))
+        except asyncio.QueueFull:
+            raise Overloaded()
+        return await future
+
+    async def _dispatch(self):
+        while True:
+            await self.slots.acquire()
+            batch = [await self.queue.get()]
+            # Give concurrent requests a moment to join this batch
+            if self.batch_window and self.queue.qsize() < self.batch_size - 1:
+                await asyncio.sleep(self.batch_window)
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            task = asyncio.create_task(self._run(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _attempt(self, jobs):
+        """Runs `jobs` in one worker within job_timeout; a pool that hangs is replaced."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            pool = self.pool
+            try:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(pool, compile_batch, jobs), self.job_timeout)
+            except asyncio.TimeoutError:
+                self._replace_pool(pool)
+                raise
+            except BrokenProcessPool:
+                if pool is self.pool or attempt:
+                    # A worker died (e.g. killed by the OS); later batches get a working pool
+                    self._replace_pool(pool)
+                    raise
+                # The pool was replaced under these jobs because another batch hung; retry once
+
+    def _failure(self, error):
+        """The exception a request gets when its job could not be run."""
+        if isinstance(error, asyncio.TimeoutError):
+            self.timeouts += 1
+            return JobTimeout()
+        return error
+
+    async def _run_alone(self, job):
+        try:
+            return (await self._attempt([job]))[0]
+        except Exception as e:
+            return self._failure(e)
+
+    async def _run(self, batch):
+        jobs = [job for job, _ in batch]
+        try:
+            try:
+                results = await self._attempt(jobs)
+            except (asyncio.TimeoutError, BrokenProcessPool) as e:
+                if len(jobs) == 1:
+                    results = [self._failure(e)]
+                else:
+                    # One job hung or took its worker down. Rerun the batch one job at a
+                    # time on the fresh pool, so only the job that fails again gets an error
+                    results = [await self._run_alone(job) for job in jobs]
+        except Exception as e:
+            results = [e] * len(batch)
+        finally:
+            self.slots.release()
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class CompileServer:
+    """Minimal HTTP/1.1 front end (keep-alive, JSON bodies) for a CompileService."""
+
+    def __init__(self, service, max_body=1 << 20):
+        self.service = service
+        self.max_body = max_body
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode('latin-1').split("\r\n")
+                try:
+                    method, path, _ = lines[0].split(" ", 2)
+                except ValueError:
+                    await self.respond(writer, 400, {'error': "Malformed request line"}, close=True)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get('connection', '').lower() != 'close'
+
+                try:
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self.respond(writer, 400, {'error': "Invalid Content-Length"}, close=True)
+                    break
+                if length > self.max_body:
+                    await self.respond(writer, 413, {'error': f"Body exceeds {self.max_body} bytes"}, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload, extra = await self.route(method, path, body)
+                await self.respond(writer, status, payload, extra, close=not keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body):
+        if path == '/health':
+            if method != 'GET':
+                return 405, {'error': "Use GET"}, {}
+            return 200, {
+                'status': 'ok',
+                'workers': self.service.workers,
+                'pending': self.service.queue.qsize(),
+                'timeouts': self.service.timeouts,
+                'pool_restarts': self.service.restarts,
+            }, {}
+
+        if path != '/compile':
+            return 404, {'error': f"Unknown path '{path}'"}, {}
+        if method != 'POST':
+            return 405, {'error': "Use POST"}, {}
+
+        try:
+            request = json.loads(body or b"null")
+        except ValueError as e:
+            return 400, {'error': f"Invalid JSON: {e}"}, {}
+        if not isinstance(request, dict) or not isinstance(request.get('code'), str):
+            return 400, {'error': "Expected a JSON object with a 'code' string"}, {}
+
+        phases = request.get('phases', PHASES)
+        if not isinstance(phases, list) or not phases:
+            return 400, {'error': "'phases' must be a non-empty list"}, {}
+        unknown = [phase for phase in phases if phase not in PHASES]
+        if unknown:
+            return 400, {'error': f"Unknown phase(s): {', '.join(map(str, unknown))}"}, {}
+
+        opt_level = request.get('opt_level', DEFAULT_LEVEL)
+        # bool is an int subclass, and True == 1 would otherwise pass as -O1
+        if isinstance(opt_level, bool) or not isinstance(opt_level, int) or opt_level not in OPT_LEVELS:
+            return 400, {'error': f"'opt_level' must be one of {sorted(OPT_LEVELS)}"}, {}
+
+        try:
+            result = await self.service.submit(request['code'], frozenset(phases), opt_level)
+        except Overloaded:
+            return 503, {'error': "Server busy, retry later"}, {'Retry-After': '1'}
+        except JobTimeout:
+            return 504, {'error': f"Compilation did not finish within {self.service.job_timeout}s"}, {}
+        except Exception as e:
+            return 500, {'error': str(e)}, {}
+        return 200, result, {}
+
+    async def respond(self, writer, status, payload, extra=None, close=False):
+        body = json.dumps(payload).encode('utf-8')
+        headers = [
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'close' if close else 'keep-alive'}",
+        ]
+        headers.extend(f"{name}: {value}" for name, value in (extra or {}).items())
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode('latin-1') + body)
+        await writer.drain()
+
+
+async def serve(host, port, workers, batch_size, batch_window, max_pending, max_body, job_timeout):
+    service = CompileService(workers, batch_size, batch_window, max_pending, job_timeout)
+    service.start()
+    front = CompileServer(service, max_body)
+    server = await asyncio.start_server(front.handle, host, port)
+    # Stop cleanly on Ctrl+C / SIGTERM so the worker processes are shut down too
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, server.close)
+    print(f"Compile service listening on http://{host}:{port} ({service.workers} workers)", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await service.close()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Local HTTP/JSON compile service")
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8000)
+    arg_parser.add_argument('--workers', type=int, default=None,
+                            help="worker processes (default: CPU count)")
+    arg_parser.add_argument('--batch-size', type=int, default=16,
+                            help="max requests sent to a worker at once")
+    arg_parser.add_argument('--batch-window-ms', type=float, default=2.0,
+                            help="how long to wait for a batch to fill")
+    arg_parser.add_argument('--max-pending', type=int, default=256,
+                            help="queued requests before answering 503")
+    arg_parser.add_argument('--max-body', type=int, default=1 << 20,
+                            help="largest accepted request body in bytes")
+    arg_parser.add_argument('--job-timeout', type=float, default=10.0,
+                            help="seconds a request may compile before answering 504 and restarting the workers")
+    args = arg_parser.parse_args()
+
+    asyncio.run(serve(args.host, args.port, args.workers, args.batch_size,
+                      args.batch_window_ms / 1000, args.max_pending, args.max_body,
+                      args.job_timeout))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,516 @@
+# ssa.py
+"""
+Static single assignment (SSA) form for the intermediate code, and sparse
+conditional constant propagation (SCCP) on top of it.
+
+    code -> build_ssa -> propagate_constants -> from_ssa -> code
+
+build_ssa splits the code into basic blocks at labels and jumps, computes
+dominators and dominance frontiers, inserts phi functions at the join labels
+and renames every assignment to a fresh version (x -> x_1, x_2, ...).
+
+propagate_constants is the Wegman-Zadeck algorithm: it only follows CFG edges
+that can actually be taken, so a branch on a constant condition never makes
+the other side's assignments reach the join.
+
+from_ssa drops blocks that can never run, replaces constant uses and
+conditions, and goes back to plain variable names. Since SCCP only replaces
+uses by constants (it never moves or copies definitions), no two versions of
+a variable are ever live at once, so dropping the phis and version numbers
+is enough - no copies have to be inserted.
+"""
+import re
+
+# SCCP lattice: TOP = no value seen yet, BOTTOM = not a constant; ints in between
+TOP = 'top'
+BOTTOM = 'bottom'
+
+IDENTIFIER = re.compile(r'(%t\d+|[A-Za-z_]\w*)$')
+
+
+def is_var(token):
+    return IDENTIFIER.match(token) is not None and token not in ('True', 'False')
+
+
+class Instr:
+    """One line of intermediate code, split into its parts."""
+
+    def __init__(self, kind, dest=None, args=(), op=None, target=None, text=None):
+        self.kind = kind      # 'assign', 'branch', 'goto', 'label' or 'other'
+        self.dest = dest      # assigned variable
+        self.args = list(args)
+        self.op = op          # binary operator, None for a plain copy
+        self.target = target  # label jumped to (or defined, for 'label')
+        self.text = text      # original line for 'other'
+
+    @classmethod
+    def parse(cls, line):
+        parts = line.split()
+        if len(parts) == 1 and line.strip().endswith(':'):
+            return cls('label', target=parts[0][:-1])
+        if len(parts) == 2 and parts[0] == 'goto':
+            return cls('goto', target=parts[1])
+        if len(parts) == 4 and parts[0] == 'if_false' and parts[2] == 'goto':
+            return cls('branch', args=[parts[1]], target=parts[3])
+        if len(parts) == 5 and parts[1] == '=' and is_var(parts[0]):
+            return cls('assign', dest=parts[0], args=[parts[2], parts[4]], op=parts[3])
+        if len(parts) == 3 and parts[1] == '=' and is_var(parts[0]):
+            return cls('assign', dest=parts[0], args=[parts[2]])
+        return cls('other', text=line)
+
+
+class Phi:
+    """x_3 = phi(x_1 from block 1, x_2 from block 2)."""
+
+    def __init__(self, var):
+        self.var = var
+        self.dest = None
+        self.args = {}  # predecessor block index -> SSA name
+
+
+class Block:
+    def __init__(self, index, label=None):
+        self.index = index
+        self.label = label
+        self.instrs = []
+        self.phis = {}  # variable -> Phi
+        self.succs = []
+        self.preds = []
+
+
+class SSAForm:
+    """Basic blocks of a piece of intermediate code, renamed into SSA form."""
+
+    def __init__(self, blocks, labels):
+        self.blocks = blocks
+        self.labels = labels  # label name -> block index
+        self.idom = {}
+        self.frontiers = {}
+
+    def fallthrough(self, block):
+        """Index of the block that follows `block` in the code, or None."""
+        return block.index + 1 if block.index + 1 < len(self.blocks) else None
+
+
+def ssa_name(name):
+    """Formats an SSA name: ('x', 2) -> 'x_2'."""
+    return f"{name[0]}_{name[1]}" if isinstance(name, tuple) else name
+
+
+def base_name(name):
+    """Drops the version: ('x', 2) -> 'x'."""
+    return name[0] if isinstance(name, tuple) else name
+
+
+# --- Construction ------------------------------------------------------------
+
+def split_blocks(inter_code):
+    """Splits code into basic blocks and links them; None if a jump target is missing."""
+    blocks = []
+    current = None
+    for line in inter_code:
+        instr = Instr.parse(line)
+        starts_block = (
+            current is None
+            or (instr.kind == 'label' and current.instrs)
+            or (current.instrs and current.instrs[-1].kind in ('goto', 'branch'))
+        )
+        if starts_block:
+            current = Block(len(blocks))
+            blocks.append(current)
+        if instr.kind == 'label' and not current.instrs:
+            current.label = instr.target
+        current.instrs.append(instr)
+
+    labels = {block.label: block.index for block in blocks if block.label is not None}
+    ssa = SSAForm(blocks, labels)
+    for block in blocks:
+        last = block.instrs[-1]
+        succs = []
+        if last.kind in ('goto', 'branch') and last.target not in labels:
+            return None
+        if last.kind != 'goto' and ssa.fallthrough(block) is not None:
+            succs.append(ssa.fallthrough(block))
+        if last.kind in ('goto', 'branch') and labels[last.target] not in succs:
+            succs.append(labels[last.target])
+        block.succs = succs
+        for succ in succs:
+            blocks[succ].preds.append(block.index)
+    return ssa
+
+
+def reverse_postorder(ssa):
+    """Blocks reachable from the entry, in reverse postorder."""
+    order = []
+    seen = {0}
+    stack = [(0, iter(ssa.blocks[0].succs))]
+    while stack:
+        index, succs = stack[-1]
+        for succ in succs:
+            if succ not in seen:
+                seen.add(succ)
+                stack.append((succ, iter(ssa.blocks[succ].succs)))
+                break
+        else:
+            stack.pop()
+            order.append(index)
+    order.reverse()
+    return order
+
+
+def compute_dominators(ssa, order):
+    """Immediate dominators (Cooper, Harvey & Kennedy's iterative algorithm)."""
+    position = {index: i for i, index in enumerate(order)}
+    idom = {order[0]: order[0]}
+
+    def intersect(a, b):
+        while a != b:
+            while position[a] > position[b]:
+                a = idom[a]
+            while position[b] > position[a]:
+                b = idom[b]
+        return a
+
+    changed = True
+    while changed:
+        changed = False
+        for index in order[1:]:
+            preds = [p for p in ssa.blocks[index].preds if p in idom]
+            new_idom = preds[0]
+            for pred in preds[1:]:
+                new_idom = intersect(pred, new_idom)
+            if idom.get(index) != new_idom:
+                idom[index] = new_idom
+                changed = True
+    ssa.idom = idom
+
+
+def compute_frontiers(ssa, order):
+    """Dominance frontier of every reachable block."""
+    frontiers = {index: set() for index in order}
+    for index in order:
+        preds = [p for p in ssa.blocks[index].preds if p in ssa.idom]
+        if len(preds) < 2:
+            continue
+        for pred in preds:
+            runner = pred
+            while runner != ssa.idom[index]:
+                frontiers[runner].add(index)
+                runner = ssa.idom[runner]
+    ssa.frontiers = frontiers
+
+
+def insert_phis(ssa, order):
+    """Places phi functions on the iterated dominance frontier of each variable's definitions."""
+    defsites = {}
+    for index in order:
+        for instr in ssa.blocks[index].instrs:
+            if instr.kind == 'assign':
+                defsites.setdefault(instr.dest, set()).add(index)
+
+    for var, sites in defsites.items():
+        worklist = list(sites)
+        while worklist:
+            index = worklist.pop()
+            for join in ssa.frontiers[index]:
+                if var not in ssa.blocks[join].phis:
+                    ssa.blocks[join].phis[var] = Phi(var)
+                    if join not in sites:
+                        worklist.append(join)
+
+
+def rename(ssa, order):
+    """Gives every definition a new version; version 0 is a variable's value on entry."""
+    children = {index: [] for index in order}
+    for index in order[1:]:
+        children[ssa.idom[index]].append(index)
+
+    counters = {}
+    stacks = {}
+
+    def current(var):
+        return var, stacks.get(var, [0])[-1]
+
+    def define(var):
+        counters[var] = counters.get(var, 0) + 1
+        stacks.setdefault(var, [0]).append(counters[var])
+        return var, counters[var]
+
+    # Walk the dominator tree; (index, None) enters a block, (None, defined) leaves it
+    walk = [(order[0], None)]
+    while walk:
+        index, defined = walk.pop()
+        if index is None:
+            for var in defined:
+                stacks[var].pop()
+            continue
+
+        block = ssa.blocks[index]
+        defined = []
+        for var, phi in block.phis.items():
+            phi.dest = define(var)
+            defined.append(var)
+        for instr in block.instrs:
+            instr.args = [current(arg) if isinstance(arg, str) and is_var(arg) else arg
+                          for arg in instr.args]
+            if instr.kind == 'assign':
+                instr.dest = define(instr.dest)
+                defined.append(instr.dest[0])
+        for succ in block.succs:
+            for var, phi in ssa.blocks[succ].phis.items():
+                phi.args[index] = current(var)
+
+        walk.append((None, defined))
+        walk.extend((child, None) for child in reversed(children[index]))
+
+
+def build_ssa(inter_code):
+    """Builds the SSA form of intermediate code, or None if it cannot be analysed."""
+    if not inter_code:
+        return None
+    if not all(isinstance(line, str) for line in inter_code):
+        return None  # nested lists from a bare { ... } block
+    ssa = split_blocks(inter_code)
+    if ssa is None:
+        return None
+    order = reverse_postorder(ssa)
+    compute_dominators(ssa, order)
+    compute_frontiers(ssa, order)
+    insert_phis(ssa, order)
+    rename(ssa, order)
+    return ssa
+
+
+def format_ssa(ssa):
+    """Readable listing of the SSA form, one block after another."""
+    lines = []
+    for block in ssa.blocks:
+        if block.index not in ssa.idom:
+            continue  # unreachable, never renamed
+        preds = ", ".join(f"B{p}" for p in block.preds if p in ssa.idom)
+        lines.append(f"B{block.index}:" + (f"  ; preds {preds}" if preds else ""))
+        instrs = block.instrs
+        if instrs[0].kind == 'label':
+            # Phis belong right after the join label
+            lines.append(f"    {format_instr(instrs[0], ssa_name)}")
+            instrs = instrs[1:]
+        for phi in block.phis.values():
+            args = ", ".join(f"{ssa_name(name)} [B{p}]" for p, name in sorted(phi.args.items()))
+            lines.append(f"    {ssa_name(phi.dest)} = phi({args})")
+        for instr in instrs:
+            lines.append(f"    {format_instr(instr, ssa_name)}")
+    return lines
+
+
+def format_instr(instr, name_of):
+    args = [name_of(arg) for arg in instr.args]
+    if instr.kind == 'label':
+        return f"{instr.target}:"
+    if instr.kind == 'goto':
+        return f"goto {instr.target}"
+    if instr.kind == 'branch':
+        return f"if_false {args[0]} goto {instr.target}"
+    if instr.kind == 'assign':
+        if instr.op is None:
+            return f"{name_of(instr.dest)} = {args[0]}"
+        return f"{name_of(instr.dest)} = {args[0]} {instr.op} {args[1]}"
+    return instr.text
+
+
+# --- Sparse conditional constant propagation ---------------------------------
+
+def literal_value(token):
+    if token.lstrip('-').isdigit():
+        return int(token)
+    if token in ('True', 'False'):
+        return int(token == 'True')
+    return BOTTOM
+
+
+def meet(a, b):
+    if a == TOP:
+        return b
+    if b == TOP or a == b:
+        return a
+    return BOTTOM
+
+
+def evaluate(left, op, right):
+    """Folds `left op right` on integers, or returns BOTTOM if it cannot be folded exactly."""
+    if op == '+':
+        return left + right
+    if op == '-':
+        return left - right
+    if op == '*':
+        return left * right
+    if op == '/':
+        # Only exact divisions, so the result stays an integer
+        if right != 0 and left % right == 0:
+            return left // right
+        return BOTTOM
+    comparisons = {
+        '>': left > right, '<': left < right, '>=': left >= right,
+        '<=': left <= right, '==': left == right, '!=': left != right,
+    }
+    if op in comparisons:
+        return int(comparisons[op])
+    return BOTTOM
+
+
+def propagate_constants(ssa):
+    """
+    Runs SCCP over the SSA form. Returns (values, executable) where values maps
+    SSA names to TOP, BOTTOM or an int, and executable is the set of blocks
+    that can run.
+    """
+    values = {}
+    uses = {}
+    for block in ssa.blocks:
+        for phi in block.phis.values():
+            for name in phi.args.values():
+                uses.setdefault(name, []).append((block, phi))
+        for instr in block.instrs:
+            for arg in instr.args:
+                if isinstance(arg, tuple):
+                    uses.setdefault(arg, []).append((block, instr))
+
+    edges = set()
+    executable = set()
+    flow_worklist = [(None, 0)]
+    ssa_worklist = []
+
+    def value(arg):
+        if isinstance(arg, tuple):
+            return BOTTOM if arg[1] == 0 else values.get(arg, TOP)
+        return literal_value(arg)
+
+    def set_value(name, new):
+        if values.get(name, TOP) != new:
+            values[name] = new
+            ssa_worklist.append(name)
+
+    def visit_phi(block, phi):
+        result = TOP
+        for pred, name in phi.args.items():
+            if (pred, block.index) in edges:
+                result = meet(result, value(name))
+        set_value(phi.dest, result)
+
+    def visit_instr(block, instr):
+        if instr.kind == 'assign':
+            operands = [value(arg) for arg in instr.args]
+            if BOTTOM in operands:
+                result = BOTTOM
+            elif TOP in operands:
+                result = TOP
+            elif instr.op is None:
+                result = operands[0]
+            else:
+                result = evaluate(operands[0], instr.op, operands[1])
+            set_value(instr.dest, result)
+        elif instr.kind == 'branch':
+            condition = value(instr.args[0])
+            taken = ssa.labels[instr.target]
+            fallthrough = ssa.fallthrough(block)
+            if condition == BOTTOM:
+                flow_worklist.extend((block.index, succ) for succ in block.succs)
+            elif condition != TOP:
+                # if_false jumps when the condition is 0
+                succ = taken if condition == 0 else fallthrough
+                if succ is not None:
+                    flow_worklist.append((block.index, succ))
+        elif instr.kind == 'goto':
+            flow_worklist.append((block.index, ssa.labels[instr.target]))
+
+    while flow_worklist or ssa_worklist:
+        if flow_worklist:
+            pred, index = flow_worklist.pop()
+            if (pred, index) in edges:
+                continue
+            edges.add((pred, index))
+            block = ssa.blocks[index]
+            for phi in block.phis.values():
+                visit_phi(block, phi)
+            if index not in executable:
+                executable.add(index)
+                for instr in block.instrs:
+                    visit_instr(block, instr)
+                if block.instrs[-1].kind not in ('goto', 'branch'):
+                    flow_worklist.extend((index, succ) for succ in block.succs)
+        else:
+            name = ssa_worklist.pop()
+            for block, user in uses.get(name, []):
+                if block.index not in executable:
+                    continue
+                if isinstance(user, Phi):
+                    visit_phi(block, user)
+                else:
+                    visit_instr(block, user)
+
+    return values, executable
+
+
+# --- Back to plain code ------------------------------------------------------
+
+def from_ssa(ssa, values, executable):
+    """
+    Rewrites the SSA form back into intermediate code: constant uses and
+    conditions are substituted, decided branches become plain jumps (or
+    disappear), blocks that never run are dropped and versions are removed.
+    """
+    def constant(name):
+        if isinstance(name, tuple) and name[1] != 0:
+            result = values.get(name, TOP)
+            if result not in (TOP, BOTTOM):
+                return result
+        return None
+
+    def name_of(name):
+        result = constant(name)
+        return str(result) if result is not None else base_name(name)
+
+    code = []
+    for block in ssa.blocks:
+        if block.index not in executable:
+            # Keep declarations so the variables stay declared
+            code.extend(instr.text for instr in block.instrs
+                        if instr.kind == 'other' and instr.text.strip().startswith('int '))
+            continue
+        for instr in block.instrs:
+            if instr.kind == 'assign' and constant(instr.dest) is not None:
+                code.append(f"{base_name(instr.dest)} = {constant(instr.dest)}")
+            elif instr.kind == 'branch' and constant(instr.args[0]) is not None:
+                if constant(instr.args[0]) == 0:
+                    code.append(f"goto {instr.target}")
+                # otherwise the branch is never taken and just falls through
+            elif (instr.kind == 'branch' and isinstance(instr.args[0], str)
+                  and literal_value(instr.args[0]) != BOTTOM):
+                if literal_value(instr.args[0]) == 0:
+                    code.append(f"goto {instr.target}")
+            else:
+                code.append(format_instr(instr, name_of))
+    return remove_dead_jumps(code)
+
+
+def remove_dead_jumps(code):
+    """Drops jumps to the very next line and labels that nothing jumps to."""
+    while True:
+        targets = {line.split()[-1] for line in code
+                   if line.startswith('goto ') or line.startswith('if_false ')}
+        cleaned = [line for line in code
+                   if not (Instr.parse(line).kind == 'label' and line.strip()[:-1] not in targets)]
+        cleaned = [line for i, line in enumerate(cleaned)
+                   if not (line.startswith('goto ') and i + 1 < len(cleaned)
+                           and cleaned[i + 1] == f"{line.split()[1]}:")]
+        if cleaned == code:
+            return code
+        code = cleaned
+
+
+def sccp(inter_code):
+    """SSA construction, sparse conditional constant propagation and out-of-SSA in one go."""
+    ssa = build_ssa(inter_code)
+    if ssa is None:
+        return list(inter_code)
+    values, executable = propagate_constants(ssa)
+    return from_ssa(ssa, values, executable)
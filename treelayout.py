@@ -0,0 +1,216 @@
+# treelayout.py
+"""
+In-process AST drawing: a tidy tree layout rendered straight to SVG, as an
+alternative to utils.build_tree + Graphviz that needs no `dot` executable,
+no subprocess and no temporary files.
+
+The layout is Buchheim, Junger & Leipert's linear-time version of the
+Reingold-Tilford algorithm, extended so that sibling subtrees are separated
+according to the width of their labels. Both tree walks are iterative, so very
+deep trees (long expression chains) do not hit the recursion limit.
+"""
+from html import escape
+
+# Drawing metrics, in pixels
+CHAR_WIDTH = 7.5
+NODE_PADDING = 24
+NODE_HEIGHT = 30
+LEVEL_GAP = 60
+SIBLING_GAP = 12
+MARGIN = 10
+FONT_SIZE = 12
+
+
+class TreeNode:
+    """One box in the drawing, plus the bookkeeping fields of the layout algorithm."""
+
+    def __init__(self, label, parent=None, number=1):
+        self.label = label
+        self.width = len(label) * CHAR_WIDTH + NODE_PADDING
+        self.children = []
+        self.parent = parent
+        self.number = number  # 1-based position among its siblings
+        self.x = 0.0
+        self.depth = 0
+        self.prelim = 0.0
+        self.mod = 0.0
+        self.shift = 0.0
+        self.change = 0.0
+        self.thread = None
+        self.ancestor = self
+        self.default_ancestor = None
+
+    def add(self, label):
+        child = TreeNode(label, self, len(self.children) + 1)
+        self.children.append(child)
+        return child
+
+    def left_sibling(self):
+        if self.parent is None or self.number == 1:
+            return None
+        return self.parent.children[self.number - 2]
+
+    def next_left(self):
+        return self.children[0] if self.children else self.thread
+
+    def next_right(self):
+        return self.children[-1] if self.children else self.thread
+
+
+def build_nodes(ast):
+    """Converts an AST into TreeNodes, with the same labels and shape as utils.build_tree."""
+    root = TreeNode(str(ast[0]))
+    stack = [(ast, root)]
+    while stack:
+        node, tree_node = stack.pop()
+        for child in node[1:]:
+            if isinstance(child, tuple):
+                stack.append((child, tree_node.add(str(child[0]))))
+            else:
+                tree_node.add(str(child))
+    return root
+
+
+def separation(left, right):
+    """Minimum distance between the centres of two neighbouring nodes."""
+    return (left.width + right.width) / 2 + SIBLING_GAP
+
+
+def move_subtree(left, right, shift):
+    subtrees = right.number - left.number
+    right.change -= shift / subtrees
+    right.shift += shift
+    left.change += shift / subtrees
+    right.prelim += shift
+    right.mod += shift
+
+
+def execute_shifts(v):
+    shift = change = 0.0
+    for w in reversed(v.children):
+        w.prelim += shift
+        w.mod += shift
+        change += w.change
+        shift += w.shift + change
+
+
+def apportion(v, default_ancestor):
+    """Pushes v's subtree right until it clears every subtree to its left."""
+    w = v.left_sibling()
+    if w is None:
+        return default_ancestor
+    vip = vop = v
+    vim = w
+    vom = v.parent.children[0]
+    sip, sop, sim, som = vip.mod, vop.mod, vim.mod, vom.mod
+    while vim.next_right() and vip.next_left():
+        vim = vim.next_right()
+        vip = vip.next_left()
+        vom = vom.next_left()
+        vop = vop.next_right()
+        vop.ancestor = v
+        shift = (vim.prelim + sim) - (vip.prelim + sip) + separation(vim, vip)
+        if shift > 0:
+            ancestor = vim.ancestor if vim.ancestor.parent is v.parent else default_ancestor
+            move_subtree(ancestor, v, shift)
+            sip += shift
+            sop += shift
+        sim += vim.mod
+        sip += vip.mod
+        som += vom.mod
+        sop += vop.mod
+    if vim.next_right() and not vop.next_right():
+        vop.thread = vim.next_right()
+        vop.mod += sim - sop
+    if vip.next_left() and not vom.next_left():
+        vom.thread = vip.next_left()
+        vom.mod += sip - som
+        default_ancestor = v
+    return default_ancestor
+
+
+def first_walk(root):
+    """Post-order pass computing preliminary x positions relative to the parent."""
+    stack = [(root, False)]
+    while stack:
+        v, children_done = stack.pop()
+        if not children_done and v.children:
+            v.default_ancestor = v.children[0]
+            stack.append((v, True))
+            stack.extend((child, False) for child in reversed(v.children))
+            continue
+
+        w = v.left_sibling()
+        if v.children:
+            execute_shifts(v)
+            midpoint = (v.children[0].prelim + v.children[-1].prelim) / 2
+            if w is not None:
+                v.prelim = w.prelim + separation(w, v)
+                v.mod = v.prelim - midpoint
+            else:
+                v.prelim = midpoint
+        elif w is not None:
+            v.prelim = w.prelim + separation(w, v)
+        if v.parent is not None:
+            v.parent.default_ancestor = apportion(v, v.parent.default_ancestor)
+
+
+def second_walk(root):
+    """Pre-order pass summing the modifiers into final x positions and depths."""
+    stack = [(root, 0.0, 0)]
+    while stack:
+        v, modsum, depth = stack.pop()
+        v.x = v.prelim + modsum
+        v.depth = depth
+        stack.extend((child, modsum + v.mod, depth + 1) for child in v.children)
+
+
+def layout(root):
+    """Lays out the tree rooted at `root`; returns all its nodes in pre-order."""
+    first_walk(root)
+    second_walk(root)
+    nodes = []
+    stack = [root]
+    while stack:
+        v = stack.pop()
+        nodes.append(v)
+        stack.extend(reversed(v.children))
+    return nodes
+
+
+def render_svg(ast):
+    """Draws an AST as an SVG document (a str)."""
+    root = build_nodes(ast)
+    nodes = layout(root)
+
+    left = min(v.x - v.width / 2 for v in nodes)
+    right = max(v.x + v.width / 2 for v in nodes)
+    depth = max(v.depth for v in nodes)
+    width = right - left + 2 * MARGIN
+    height = depth * (NODE_HEIGHT + LEVEL_GAP) + NODE_HEIGHT + 2 * MARGIN
+
+    def cx(v):
+        return v.x - left + MARGIN
+
+    def cy(v):
+        return v.depth * (NODE_HEIGHT + LEVEL_GAP) + NODE_HEIGHT / 2 + MARGIN
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+        f'viewBox="0 0 {width:.1f} {height:.1f}" font-family="Times,serif" font-size="{FONT_SIZE}">',
+        '<g stroke="black" fill="none">',
+    ]
+    for v in nodes:
+        for child in v.children:
+            parts.append(f'<line x1="{cx(v):.1f}" y1="{cy(v) + NODE_HEIGHT / 2:.1f}" '
+                         f'x2="{cx(child):.1f}" y2="{cy(child) - NODE_HEIGHT / 2:.1f}"/>')
+    for v in nodes:
+        parts.append(f'<ellipse cx="{cx(v):.1f}" cy="{cy(v):.1f}" '
+                     f'rx="{v.width / 2:.1f}" ry="{NODE_HEIGHT / 2:.1f}" fill="white"/>')
+    parts.append('</g>')
+    parts.append('<g text-anchor="middle" dominant-baseline="central">')
+    for v in nodes:
+        parts.append(f'<text x="{cx(v):.1f}" y="{cy(v):.1f}">{escape(v.label)}</text>')
+    parts.append('</g>')
+    parts.append('</svg>')
+    return "\n".join(parts)